@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Proof of Corn - Decision engine benchmarks
+Stress and throughput checks that exit non-zero when something regresses.
+
+Usage:
+    python benchmarks.py            # run everything
+    python benchmarks.py log        # concurrent log writers only
+    python benchmarks.py weather    # provider fan-out with simulated latency
+    python benchmarks.py rules      # compiled rules vs hand-written branches
+    python benchmarks.py startup    # cli.py start-up time budget
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+import json
+import time
+import tempfile
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from decision_log import FORMAT_JSON, FORMAT_JSONL, GroupCommitWriter, append_entries
+from rules import RULES_FILE, RuleBook
+from weather import CurrentConditions, Forecast, WeatherForecast, WeatherProvider, WeatherService
+
+
+def _entry(worker: int, seq: int) -> dict:
+    return {
+        "timestamp": "2026-04-20T08:00:00",
+        "type": "planting",
+        "action": "WAIT",
+        "rationale": f"worker {worker} decision {seq}",
+        "priority": "normal",
+        "data": {"worker": worker, "seq": seq},
+    }
+
+
+def _naive_log(path: Path, entry: dict):
+    """The old log_decision: unlocked read-modify-write, one open/write/close per decision."""
+    try:
+        with open(path, "r") as f:
+            logs = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        logs = []
+    logs.append(entry)
+    with open(path, "w") as f:
+        json.dump(logs, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _process_worker(path: str, fmt: str, worker: int, threads: int, per_thread: int):
+    """One process of a fleet run: several threads sharing one group-commit writer."""
+    with GroupCommitWriter(path, fmt) as writer:
+        def run(t):
+            for seq in range(per_thread):
+                writer.write(_entry(worker * threads + t, seq))
+
+        pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+        for th in pool:
+            th.start()
+        for th in pool:
+            th.join()
+
+
+def _read_entries(path: Path, fmt: str) -> list:
+    if fmt == FORMAT_JSON:
+        with open(path) as f:
+            return json.load(f)
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def bench_log(processes: int = 4, threads: int = 8, per_thread: int = 50) -> bool:
+    """No lost records under concurrent load, and group commit beats per-decision writes."""
+    print("=" * 60)
+    print("LOG WRITERS")
+    print("=" * 60)
+    ok = True
+    expected = processes * threads * per_thread
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Correctness: several processes x threads hammering the same files
+        for fmt in (FORMAT_JSON, FORMAT_JSONL):
+            path = Path(tmp) / f"stress.{fmt}"
+            start = time.perf_counter()
+            procs = [
+                multiprocessing.Process(target=_process_worker, args=(str(path), fmt, p, threads, per_thread))
+                for p in range(processes)
+            ]
+            for proc in procs:
+                proc.start()
+            for proc in procs:
+                proc.join()
+            elapsed = time.perf_counter() - start
+
+            entries = _read_entries(path, fmt)
+            keys = {(e["data"]["worker"], e["data"]["seq"]) for e in entries}
+            lost = expected - len(keys)
+            status = "✓" if lost == 0 and len(entries) == expected else "✗"
+            ok = ok and status == "✓"
+            print(f"  {status} {fmt:5} {processes} procs x {threads} threads: "
+                  f"{len(entries)}/{expected} records, {lost} lost ({elapsed:.2f}s)")
+
+        # Throughput: one open/write/close/fsync per decision vs group commit
+        total = threads * per_thread
+        naive_path = Path(tmp) / "naive.json"
+        start = time.perf_counter()
+        for seq in range(total):
+            _naive_log(naive_path, _entry(0, seq))
+        naive_rate = total / (time.perf_counter() - start)
+
+        locked_path = Path(tmp) / "locked.json"
+        start = time.perf_counter()
+        for seq in range(total):
+            append_entries(locked_path, [_entry(0, seq)], FORMAT_JSON)
+        locked_rate = total / (time.perf_counter() - start)
+
+        group_path = Path(tmp) / "group.json"
+        start = time.perf_counter()
+        _process_worker(str(group_path), FORMAT_JSON, 0, threads, per_thread)
+        group_rate = total / (time.perf_counter() - start)
+
+        print()
+        print(f"  naive per-decision write:   {naive_rate:8.0f} decisions/s")
+        print(f"  locked per-decision write:  {locked_rate:8.0f} decisions/s")
+        print(f"  group commit ({threads} threads): {group_rate:8.0f} decisions/s "
+              f"({group_rate / naive_rate:.1f}x naive)")
+        if group_rate <= naive_rate:
+            print("  ✗ Group commit is not faster than per-decision writes")
+            ok = False
+
+    print()
+    return ok
+
+
+class _SimulatedProvider(WeatherProvider):
+    """Offline provider with a fixed latency and a fixed forecast."""
+
+    def __init__(self, name: str, latency: float, high: float, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.high = high
+        self.fail = fail
+
+    def fetch(self, lat: float, lon: float) -> Forecast:
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("simulated outage")
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        periods = [WeatherForecast(today + timedelta(days=d), self.high, self.high - 20, 10, 0.1)
+                   for d in range(5)]
+        return Forecast(self.name, datetime.now(), periods, CurrentConditions(temp=self.high))
+
+
+def bench_weather(rounds: int = 5) -> bool:
+    """Hedged requests track the fastest provider; consensus takes the median."""
+    print("=" * 60)
+    print("WEATHER FAN-OUT")
+    print("=" * 60)
+    ok = True
+
+    providers = [
+        _SimulatedProvider("slow", 0.40, 60),
+        _SimulatedProvider("down", 0.05, 0, fail=True),
+        _SimulatedProvider("fast", 0.05, 62),
+        _SimulatedProvider("medium", 0.15, 70),
+    ]
+    service = WeatherService(providers, 41.5868, -93.6250)
+
+    start = time.perf_counter()
+    for p in providers:
+        try:
+            p.fetch(0, 0)
+        except ConnectionError:
+            pass
+    sequential = time.perf_counter() - start
+
+    timings = []
+    winners = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        forecast = service.fastest(hedge_after=0.1)
+        timings.append(time.perf_counter() - start)
+        winners.append(forecast.provider if forecast else None)
+
+    print(f"  one-by-one, all providers: {sequential * 1000:6.0f}ms")
+    for i, (t, w) in enumerate(zip(timings, winners)):
+        print(f"  hedged round {i + 1}:          {t * 1000:6.0f}ms -> {w}")
+    print(f"  ranking after {rounds} rounds: {', '.join(p.name for p in service.ranked())}")
+
+    if winners[-1] != "fast" or service.ranked()[0].name != "fast":
+        print("  ✗ Slow/failing providers were not deprioritized")
+        ok = False
+    if timings[-1] >= 0.15:
+        print("  ✗ Hedged request did not return at fast-provider latency")
+        ok = False
+
+    merged = service.consensus()
+    print(f"  consensus of {', '.join(merged.sources)}: high {merged.daily()[0].high_temp:.0f}°F")
+    if merged.daily()[0].high_temp != 62 or "down" in merged.sources:
+        print("  ✗ Consensus should be the median of healthy providers (62°F)")
+        ok = False
+
+    # A provider demoted by one failure is not called again while the leader
+    # answers, so only aging its stats can give it another try
+    flaky = _SimulatedProvider("flaky", 0.02, 62)
+    recovering = WeatherService([flaky, _SimulatedProvider("steady", 0.08, 62)], 41.5868, -93.6250)
+    recovering.stats["flaky"].record(0.0, ok=False)
+    before = recovering.fastest(hedge_after=0.2)
+    recovering.stats["flaky"].updated -= 2 * 24 * 3600
+    after = recovering.fastest(hedge_after=0.2)
+    print(f"  after one failure: {before.provider}, two days later: {after.provider}")
+    if (before.provider, after.provider) != ("steady", "flaky"):
+        print("  ✗ A provider demoted by an old failure was never retried")
+        ok = False
+
+    # A forecast-only provider (no current conditions, no rain amounts) must
+    # not win when the caller needs those, even when it is the fastest
+    forecast_only = _SimulatedProvider("forecast-only", 0.01, 80)
+    forecast_only.has_current = forecast_only.has_precip_amounts = False
+    picky = WeatherService([forecast_only, _SimulatedProvider("full", 0.05, 62)], 41.5868, -93.6250)
+    winner = picky.fastest(hedge_after=0.1, require_current=True, require_precip=True)
+    print(f"  requiring current + rain amounts: {winner.provider if winner else None}")
+    if not winner or winner.provider != "full":
+        print("  ✗ A provider without current conditions or rain amounts was accepted")
+        ok = False
+
+    print()
+    return ok
+
+
+def _handwritten_planting(soil_temp, rain_5day, avg_high_5day, now):
+    """The branches should_plant used before rules.json, for comparison."""
+    planting_window_start = datetime(now.year, 4, 11)
+    planting_window_end = datetime(now.year, 5, 18)
+    in_window = planting_window_start <= now <= planting_window_end
+
+    rationale_parts = []
+    can_plant = True
+    if not in_window:
+        if now < planting_window_start:
+            rationale_parts.append("Before planting window (starts April 11)")
+            can_plant = False
+        else:
+            rationale_parts.append("Late in planting window - yields may be reduced")
+    else:
+        rationale_parts.append("Within optimal planting window")
+
+    if soil_temp is not None:
+        if soil_temp >= 50:
+            rationale_parts.append(f"Soil temp {soil_temp}°F >= 50°F threshold")
+        else:
+            rationale_parts.append(f"Soil temp {soil_temp}°F below 50°F threshold")
+            can_plant = False
+
+    if rain_5day is not None:
+        if rain_5day > 1.0:
+            rationale_parts.append(f"Heavy rain expected ({rain_5day:.1f}\" in 5 days) - delay planting")
+            can_plant = False
+        if avg_high_5day < 55:
+            rationale_parts.append(f"Cool temps forecast (avg {avg_high_5day:.0f}°F) - monitor")
+
+    action = "PLANT" if can_plant else "WAIT"
+    priority = "urgent" if can_plant and in_window else "normal"
+    return action, priority, " | ".join(rationale_parts)
+
+
+def _handwritten_irrigation(soil_moisture, rain_48h, now):
+    """The branches should_irrigate used before rules.json, for comparison."""
+    rationale_parts = []
+    needs_irrigation = False
+    if soil_moisture < 40:
+        rationale_parts.append(f"Soil moisture {soil_moisture}% below 40% threshold")
+        needs_irrigation = True
+    elif soil_moisture > 80:
+        rationale_parts.append(f"Soil moisture {soil_moisture}% adequate - no irrigation needed")
+    else:
+        rationale_parts.append(f"Soil moisture {soil_moisture}% in acceptable range")
+
+    if rain_48h is not None and rain_48h > 0.5:
+        rationale_parts.append(f"Rain expected ({rain_48h:.1f}\" in 48h) - hold irrigation")
+        needs_irrigation = False
+
+    action = "IRRIGATE" if needs_irrigation else "HOLD"
+    priority = "urgent" if needs_irrigation and soil_moisture < 30 else "normal"
+    return action, priority, " | ".join(rationale_parts)
+
+
+def _handwritten_daily_check(temp, now):
+    """The branches analyze_conditions used before rules.json, for comparison."""
+    start_date = datetime(now.year, 4, 11)
+    end_date = datetime(now.year, 5, 18)
+    if now < start_date:
+        window_status = f"BEFORE_WINDOW ({(start_date - now).days} days until April 11)"
+        in_window = False
+    elif now > end_date:
+        window_status = "PAST_WINDOW (yields may be reduced)"
+        in_window = False
+    else:
+        window_status = "IN_WINDOW"
+        in_window = True
+
+    temp_ready = temp >= 50
+    if in_window and temp_ready:
+        decision, rationale = "PLANT", "Conditions favorable"
+    elif not in_window:
+        decision, rationale = "WAIT", window_status
+    else:
+        decision, rationale = "WAIT", f"Temperature {temp:.0f}°F below 50°F threshold"
+    return window_status, decision, rationale
+
+
+def bench_rules(fields: int = 20000, budget: float = 3.0) -> bool:
+    """Compiled rules agree with the old branches, stay within `budget`x of
+    their speed per field, and pick up edits to the rule file."""
+    print("=" * 60)
+    print("DECISION RULES")
+    print("=" * 60)
+    ok = True
+
+    contexts = [
+        {
+            "soil_temp": None if i % 7 == 0 else 40 + i % 25,
+            "rain_5day": None if i % 11 == 0 else (i % 17) / 10,
+            "avg_high_5day": 45 + i % 20,
+        }
+        for i in range(fields)
+    ]
+    for ctx in contexts:
+        if ctx["rain_5day"] is None:
+            ctx["avg_high_5day"] = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rules.json"
+        shutil.copy(RULES_FILE, path)
+        book = RuleBook(str(path), check_interval=0)
+
+        irrigation = [
+            {"soil_moisture": 20 + i % 70, "rain_48h": None if i % 13 == 0 else (i % 9) / 10}
+            for i in range(500)
+        ]
+        checks = [{"temp": 30 + (i % 400) / 10} for i in range(500)]
+
+        def planting(ctx, now):
+            outcome = book.evaluate("planting", ctx, now)
+            return (outcome.outputs["action"], outcome.outputs["priority"], outcome.rationale), \
+                _handwritten_planting(ctx["soil_temp"], ctx["rain_5day"], ctx["avg_high_5day"], now)
+
+        def irrigate(ctx, now):
+            outcome = book.evaluate("irrigation", ctx, now)
+            return (outcome.outputs["action"], outcome.outputs["priority"], outcome.rationale), \
+                _handwritten_irrigation(ctx["soil_moisture"], ctx["rain_48h"], now)
+
+        def daily_check(ctx, now):
+            o = book.evaluate("daily_check", ctx, now).outputs
+            return (o["window_status"], o["action"], o["rationale"]), _handwritten_daily_check(ctx["temp"], now)
+
+        for name, compare, cases in (("planting", planting, contexts[:500]),
+                                     ("irrigation", irrigate, irrigation),
+                                     ("daily_check", daily_check, checks)):
+            mismatches = 0
+            for now in (datetime(2026, 1, 22), datetime(2026, 4, 20), datetime(2026, 6, 1)):
+                for ctx in cases:
+                    got, expected = compare(ctx, now)
+                    mismatches += got != expected
+            print(f"  {'✓' if mismatches == 0 else '✗'} {name}: {mismatches} mismatches against hand-written branches")
+            ok = ok and mismatches == 0
+
+        # A missing reading must not crash a ruleset (backtest replays old logs)
+        try:
+            book.evaluate("daily_check", {"temp": None}, datetime(2026, 4, 20))
+            book.evaluate("irrigation", {"soil_moisture": None, "rain_48h": None}, datetime(2026, 4, 20))
+        except TypeError as e:
+            print(f"  ✗ None input raised: {e}")
+            ok = False
+
+        now = datetime(2026, 4, 20)
+        start = time.perf_counter()
+        for ctx in contexts:
+            _handwritten_planting(ctx["soil_temp"], ctx["rain_5day"], ctx["avg_high_5day"], now)
+        handwritten = (time.perf_counter() - start) / fields
+
+        start = time.perf_counter()
+        for ctx in contexts:
+            book.evaluate("planting", ctx, now)
+        single = (time.perf_counter() - start) / fields
+
+        start = time.perf_counter()
+        book.evaluate_batch("planting", contexts, now)
+        batch = (time.perf_counter() - start) / fields
+
+        print(f"  hand-written branches: {handwritten * 1e6:6.2f}µs/field")
+        print(f"  compiled, per field:   {single * 1e6:6.2f}µs/field")
+        print(f"  compiled, batch:       {batch * 1e6:6.2f}µs/field")
+        if batch > handwritten * budget:
+            print(f"  ✗ Batch evaluation slower than {budget}x hand-written branches")
+            ok = False
+
+        # Hot reload: raise the soil temp threshold and expect a different decision
+        ctx = {"soil_temp": 52, "rain_5day": 0.0, "avg_high_5day": 60}
+        before = book.evaluate("planting", ctx, now).outputs["action"]
+        with open(path) as f:
+            spec = json.load(f)
+        spec["thresholds"]["soil_temp_min_plant"] = 55
+        with open(path, "w") as f:
+            json.dump(spec, f)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+        after = book.evaluate("planting", ctx, now).outputs["action"]
+
+        with open(path, "w") as f:
+            f.write("{ not json")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 2_000_000))
+        kept = book.evaluate("planting", ctx, now).outputs["action"]
+
+        reloaded = (before, after, kept) == ("PLANT", "WAIT", "WAIT")
+        print(f"  {'✓' if reloaded else '✗'} hot reload: {before} -> {after} after edit, {kept} after a bad edit")
+        ok = ok and reloaded
+
+    print()
+    return ok
+
+
+def _best_of(cmd: list, runs: int, env: dict) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_startup(runs: int = 7, help_budget: float = 0.030, check_budget: float = 0.060) -> bool:
+    """`cli.py --help` and a cache-hit `cli.py check` stay within their budgets,
+    measured on top of a bare interpreter start so the machine's own Python
+    start-up cost is not counted."""
+    print("=" * 60)
+    print("CLI STARTUP")
+    print("=" * 60)
+    ok = True
+    here = Path(__file__).parent
+    cli = str(here / "cli.py")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "FARM_CACHE_DIR": str(Path(tmp) / "cache"), "FARM_LOG_DIR": str(Path(tmp) / "logs")}
+        env.pop("OPENWEATHER_API_KEY", None)
+
+        # Seed the weather cache exactly where `check` will look for it
+        import daily_check
+        service = WeatherService([], daily_check.FARM_LAT, daily_check.FARM_LON,
+                                 cache_dir=env["FARM_CACHE_DIR"], max_age=60)
+        service._save_cache(service._cache_mode("fastest", True, True), _SimulatedProvider("cached", 0, 45).fetch(0, 0))
+
+        bare = _best_of([sys.executable, "-c", "pass"], runs, env)
+        help_time = _best_of([sys.executable, cli, "--help"], runs, env)
+        check_time = _best_of([sys.executable, cli, "check"], runs, env)
+
+        imports = subprocess.run([sys.executable, "-X", "importtime", cli, "check"], env=env,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+        heavy = [m for m in ("requests", "urllib3", "concurrent.futures", "statistics")
+                 if f" {m}\n" in imports or f" {m}." in imports]
+
+    print(f"  bare interpreter:        {bare * 1000:6.1f}ms")
+    for name, t, budget in (("--help", help_time, help_budget), ("check (cache hit)", check_time, check_budget)):
+        overhead = t - bare
+        status = "✓" if overhead <= budget else "✗"
+        ok = ok and status == "✓"
+        print(f"  {status} {name:22} {t * 1000:6.1f}ms (+{overhead * 1000:.1f}ms, budget +{budget * 1000:.0f}ms)")
+
+    if heavy:
+        print(f"  ✗ cache-hit check imported {', '.join(heavy)}")
+        ok = False
+    else:
+        print("  ✓ cache-hit check imported no HTTP client, thread pool or statistics")
+
+    print()
+    return ok
+
+
+BENCHMARKS = {
+    "log": bench_log,
+    "weather": bench_weather,
+    "rules": bench_rules,
+    "startup": bench_startup,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+        sys.exit(2)
+
+    results = {name: BENCHMARKS[name]() for name in names}
+
+    print("=" * 60)
+    for name, ok in results.items():
+        print(f"  {'✓' if ok else '✗'} {name}")
+    print("=" * 60)
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Proof of Corn - Decision engine command line
+One entry point for everything the decision engine does.
+
+Usage:
+    python cli.py check [--consensus] [--max-age SECONDS]
+    python cli.py decide [--max-age SECONDS] [--log-file decisions.json]
+    python cli.py report [--max-age SECONDS]
+    python cli.py backtest [--log ../logs/all_checks.jsonl]
+    python cli.py serve [--port 8080] [--max-age SECONDS]
+
+Can be automated with cron:
+    0 8 * * * cd /path/to/proof-of-corn/decision-engine && python cli.py check >> ../logs/daily.log 2>&1
+
+Only argparse is imported up front. Each subcommand imports what it needs,
+so `--help` and a check served from the weather cache start quickly
+(`python benchmarks.py startup` enforces the budget).
+"""
+
+import sys
+import argparse
+
+DEFAULT_MAX_AGE = 900  # seconds a cached forecast is reused
+
+
+def cmd_check(args):
+    import daily_check
+
+    daily_check.run(consensus=args.consensus, max_age=args.max_age)
+
+
+def _manager(args):
+    import farm_manager
+    from weather import CACHE_DIR, WeatherService, default_providers
+
+    weather = WeatherService(default_providers(farm_manager.OPENWEATHER_API_KEY),
+                             farm_manager.FARM_LAT, farm_manager.FARM_LON,
+                             cache_dir=CACHE_DIR, max_age=args.max_age)
+    return farm_manager, farm_manager.FarmManager(weather=weather)
+
+
+def cmd_decide(args):
+    farm_manager, manager = _manager(args)
+    farm_manager.run_decisions(manager, args.log_file)
+
+
+def cmd_report(args):
+    _, manager = _manager(args)
+    print(manager.generate_status_report())
+
+
+def cmd_backtest(args):
+    """Replay logged checks through the current rules and show what would change."""
+    import json
+    from datetime import datetime
+    from rules import get_rulebook
+
+    rules = get_rulebook()
+    total = changed = skipped = 0
+    try:
+        f = open(args.log)
+    except OSError as e:
+        print(f"Backtest: cannot read checks log {args.log}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+    with f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                when = datetime.fromisoformat(record["timestamp"])
+                temp = record["current"]["temp"]
+                before = record["decision"]["action"]
+                if temp is not None and not isinstance(temp, (int, float)):
+                    raise TypeError(f"current.temp is {temp!r}")
+            except (ValueError, KeyError, TypeError) as e:
+                skipped += 1
+                print(f"  line {number}: skipped malformed record ({type(e).__name__}: {e})")
+                continue
+            outcome = rules.evaluate("daily_check", {"temp": temp}, when)
+            total += 1
+            after = outcome.outputs["action"]
+            if before != after:
+                changed += 1
+                print(f"  {when:%Y-%m-%d %H:%M}: {before} -> {after} ({outcome.rationale})")
+
+    print(f"Backtest: {changed} of {total} logged checks would change under {rules.path}")
+    if skipped:
+        print(f"Backtest: skipped {skipped} malformed record(s)")
+
+
+def cmd_serve(args):
+    """Serve the latest check, rules and health as JSON over HTTP."""
+    import json
+    import daily_check
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from rules import get_rulebook
+
+    service = daily_check.weather_service(args.max_age)  # shared, so provider rankings carry over
+
+    def check():
+        forecast = daily_check.get_weather(service=service)
+        if not forecast:
+            return 503, {"error": "no weather provider returned a forecast"}
+        return 200, daily_check.analyze_conditions(forecast)
+
+    def rules():
+        book = get_rulebook()
+        return 200, {"thresholds": book.thresholds, "window": book.window()}
+
+    routes = {
+        "/check": check,
+        "/rules": rules,
+        "/health": lambda: (200, {"status": "ok"}),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            route = routes.get(self.path.split("?")[0])
+            status, body = route() if route else (404, {"error": f"unknown path {self.path}"})
+            payload = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"🌽 Serving {', '.join(routes)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Proof of Corn decision engine")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    def add(name, func, help):
+        p = sub.add_parser(name, help=help, description=help)
+        p.set_defaults(func=func)
+        return p
+
+    def max_age(p):
+        p.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE, metavar="SECONDS",
+                       help=f"reuse a cached forecast up to this old (default {DEFAULT_MAX_AGE}, 0 = always fetch)")
+
+    p = add("check", cmd_check, "daily weather check: log conditions and the planting decision")
+    p.add_argument("--consensus", action="store_true", help="merge every provider that answers")
+    max_age(p)
+
+    p = add("decide", cmd_decide, "make and log planting and irrigation decisions")
+    p.add_argument("--log-file", default="decisions.json", help="decision log (default decisions.json)")
+    max_age(p)
+
+    p = add("report", cmd_report, "print the farm status report")
+    max_age(p)
+
+    p = add("backtest", cmd_backtest, "replay logged checks through the current rules")
+    p.add_argument("--log", default=None, help="checks log (default logs/all_checks.jsonl)")
+
+    p = add("serve", cmd_serve, "serve checks and rules as JSON over HTTP")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080)
+    max_age(p)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "backtest" and args.log is None:
+        from daily_check import LOG_DIR
+
+        args.log = LOG_DIR / "all_checks.jsonl"
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -4,8 +4,9 @@ Proof of Corn - Daily Weather Check
 Run this daily to log conditions and update planting decision.
 
 Usage:
-    export OPENWEATHER_API_KEY="your-key"
+    export OPENWEATHER_API_KEY="your-key"   # optional - free providers are used too
     python daily_check.py
+    python daily_check.py --consensus       # merge every provider that answers
 
 Can be automated with cron:
     0 8 * * * cd /path/to/proof-of-corn && python daily_check.py >> logs/daily.log 2>&1
@@ -13,110 +14,89 @@ Can be automated with cron:
 
 import os
 import sys
-import json
-import requests
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from decision_log import FORMAT_JSONL, get_writer, write_json_atomic
+from rules import get_rulebook
+from weather import CACHE_DIR, CurrentConditions, Forecast, WeatherService, default_providers, total_precip
+
 # Configuration
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 FARM_LAT = 41.5868
 FARM_LON = -93.6250
 LOCATION = "Des Moines, Iowa"
 
-# Planting window for Iowa corn
-PLANTING_START = (4, 11)  # April 11
-PLANTING_END = (5, 18)    # May 18
-SOIL_TEMP_THRESHOLD = 50  # °F
+# Planting window and thresholds for Iowa corn live in rules.json (see rules.py)
 
 # Log directory
-LOG_DIR = Path(__file__).parent.parent / "logs"
-
-
-def get_weather():
-    """Fetch current weather and forecast."""
-    url = "https://api.openweathermap.org/data/3.0/onecall"
-    params = {
-        "lat": FARM_LAT,
-        "lon": FARM_LON,
-        "appid": API_KEY,
-        "units": "imperial",
-        "exclude": "minutely,hourly"
-    }
+LOG_DIR = Path(os.getenv("FARM_LOG_DIR", Path(__file__).parent.parent / "logs"))
+
+
+def weather_service(max_age=0) -> WeatherService:
+    """The farm's providers, with a forecast cache reused for up to max_age seconds."""
+    return WeatherService(default_providers(API_KEY), FARM_LAT, FARM_LON,
+                          cache_dir=CACHE_DIR, max_age=max_age)
 
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return response.json()
+
+def get_weather(consensus=False, max_age=0, service=None):
+    """Fetch current weather and forecast - fastest provider, or a consensus.
+    A cached forecast up to max_age seconds old is used without any API call.
+    Pass `service` to reuse one WeatherService (and its latency stats) across calls."""
+    service = service or weather_service(max_age)
+    # Only providers that report observed current conditions: the planting
+    # decision is made on today's temperature, not a forecast of it
+    if consensus:
+        forecast = service.consensus(require_current=True)
     else:
-        print(f"API Error: {response.status_code}")
-        return None
+        forecast = service.fastest(require_current=True, require_precip=True)
+    for line in service.report(forecast):
+        print(f"Weather provider {line}")
+    return forecast
 
 
-def analyze_conditions(data):
+def analyze_conditions(forecast: Forecast):
     """Analyze weather data and make planting decision."""
     now = datetime.now()
-    current = data.get("current", {})
-    daily = data.get("daily", [])
-
-    temp = current.get("temp", 0)
-    conditions = current.get("weather", [{}])[0].get("description", "unknown")
-    humidity = current.get("humidity", 0)
-
-    # Check planting window
-    start_date = datetime(now.year, *PLANTING_START)
-    end_date = datetime(now.year, *PLANTING_END)
-
-    if now < start_date:
-        days_until = (start_date - now).days
-        window_status = f"BEFORE_WINDOW ({days_until} days until April 11)"
-        in_window = False
-    elif now > end_date:
-        window_status = "PAST_WINDOW (yields may be reduced)"
-        in_window = False
-    else:
-        window_status = "IN_WINDOW"
-        in_window = True
+    current = forecast.current or CurrentConditions()
+    daily = forecast.daily()
 
-    # Temperature check (using air as proxy for soil)
-    temp_ready = temp >= SOIL_TEMP_THRESHOLD
+    temp = current.temp
+    conditions = current.conditions
+    humidity = current.humidity
+
+    # Planting window + temperature check (using air as proxy for soil)
+    rules = get_rulebook()
+    window = rules.window(now)
+    outcome = rules.evaluate("daily_check", {"temp": temp}, now)
 
     # 5-day precipitation forecast
-    precip_5day = sum(day.get("rain", 0) for day in daily[:5]) / 25.4  # mm to inches
-
-    # Decision
-    if in_window and temp_ready:
-        decision = "PLANT"
-        rationale = "Conditions favorable"
-    elif not in_window:
-        decision = "WAIT"
-        rationale = window_status
-    else:
-        decision = "WAIT"
-        rationale = f"Temperature {temp:.0f}°F below {SOIL_TEMP_THRESHOLD}°F threshold"
+    precip_5day = total_precip(daily[:5])  # inches, None if unknown
 
     return {
         "timestamp": now.isoformat(),
         "location": LOCATION,
+        "weather_source": forecast.sources or [forecast.provider],
         "current": {
             "temp": temp,
-            "feels_like": current.get("feels_like", 0),
+            "feels_like": current.feels_like,
             "humidity": humidity,
             "conditions": conditions,
-            "wind_speed": current.get("wind_speed", 0)
+            "wind_speed": current.wind_speed
         },
         "forecast_5day": {
-            "precip_total_inches": round(precip_5day, 2),
-            "temps": [(day.get("temp", {}).get("min", 0), day.get("temp", {}).get("max", 0)) for day in daily[:5]]
+            "precip_total_inches": round(precip_5day, 2) if precip_5day is not None else None,
+            "temps": [(day.low_temp, day.high_temp) for day in daily[:5]]
         },
         "analysis": {
-            "window_status": window_status,
-            "in_window": in_window,
-            "temp_ready": temp_ready,
-            "days_until_window": (start_date - now).days if now < start_date else 0
+            "window_status": outcome.outputs["window_status"],
+            "in_window": window["in_window"],
+            "temp_ready": outcome.values["temp_ready"],
+            "days_until_window": window["days_until_window"]
         },
         "decision": {
-            "action": decision,
-            "rationale": rationale
+            "action": outcome.outputs["action"],
+            "rationale": outcome.rationale
         }
     }
 
@@ -128,13 +108,11 @@ def log_check(result):
     date_str = datetime.now().strftime("%Y-%m-%d")
     log_file = LOG_DIR / f"check_{date_str}.json"
 
-    with open(log_file, "w") as f:
-        json.dump(result, f, indent=2)
+    write_json_atomic(log_file, result)
 
-    # Also append to running log
+    # Also append to running log (shared with any overlapping run)
     running_log = LOG_DIR / "all_checks.jsonl"
-    with open(running_log, "a") as f:
-        f.write(json.dumps(result) + "\n")
+    get_writer(running_log, FORMAT_JSONL).write(result)
 
     return log_file
 
@@ -156,11 +134,15 @@ def print_report(result):
 
     a = result["analysis"]
     print(f"WINDOW:   {a['window_status']}")
-    print(f"TEMP:     {'✓ Ready' if a['temp_ready'] else '✗ Too cold'} ({c['temp']:.0f}°F / {SOIL_TEMP_THRESHOLD}°F needed)")
+    threshold = get_rulebook().thresholds["soil_temp_min_plant"]
+    print(f"TEMP:     {'✓ Ready' if a['temp_ready'] else '✗ Too cold'} ({c['temp']:.0f}°F / {threshold}°F needed)")
     print()
 
     f = result["forecast_5day"]
-    print(f"5-DAY:    {f['precip_total_inches']:.1f}\" precipitation expected")
+    if f["precip_total_inches"] is None:
+        print("5-DAY:    precipitation amount unknown")
+    else:
+        print(f"5-DAY:    {f['precip_total_inches']:.1f}\" precipitation expected")
     print()
 
     d = result["decision"]
@@ -171,19 +153,15 @@ def print_report(result):
     print("=" * 60)
 
 
-def main():
-    if not API_KEY:
-        print("Error: OPENWEATHER_API_KEY not set")
-        sys.exit(1)
-
+def run(consensus=False, max_age=0):
     # Get weather
-    data = get_weather()
-    if not data:
+    forecast = get_weather(consensus, max_age)
+    if not forecast:
         print("Failed to get weather data")
         sys.exit(1)
 
     # Analyze
-    result = analyze_conditions(data)
+    result = analyze_conditions(forecast)
 
     # Log
     log_file = log_check(result)
@@ -191,6 +169,11 @@ def main():
     # Report
     print_report(result)
     print(f"Logged to: {log_file}")
+    return result
+
+
+def main():
+    run(consensus="--consensus" in sys.argv)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+"""
+Proof of Corn - Concurrency-safe log writers
+Shared by farm_manager.py and daily_check.py.
+
+Cron, a manual run and a fleet of workers can all write the same log files
+at once. Every write here happens under an exclusive lock on a sidecar
+`.lock` file, so the read-modify-write of decisions.json never loses entries.
+
+GroupCommitWriter adds group commit on top: callers hand entries to a single
+writer thread, which drains whatever has queued up and commits the whole
+batch with one lock, one write and one fsync.
+"""
+
+import os
+import json
+import time
+import fcntl
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+FORMAT_JSON = "json"    # whole file is one JSON array (decisions.json)
+FORMAT_JSONL = "jsonl"  # one JSON object per line (all_checks.jsonl)
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock for `path` across threads and processes."""
+    lock_path = f"{path}.lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def write_json_atomic(path, data, indent: int = 2):
+    """Replace `path` with `data` so readers never see a half-written file."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _set_aside(path) -> Path:
+    """Rename an unreadable log out of the way so its contents are never overwritten."""
+    path = Path(path)
+    aside = path.with_name(f"{path.name}.corrupt-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}")
+    os.replace(path, aside)
+    print(f"Warning: {path} is not a JSON list - moved it to {aside} and started a new log")
+    return aside
+
+
+def _append_json(path, entries: List[Dict]):
+    try:
+        with open(path, "r") as f:
+            logs = json.load(f)
+    except FileNotFoundError:
+        logs = []
+    except json.JSONDecodeError:
+        _set_aside(path)
+        logs = []
+    else:
+        if not isinstance(logs, list):
+            _set_aside(path)
+            logs = []
+
+    logs.extend(entries)
+    write_json_atomic(path, logs)
+
+
+def _append_jsonl(path, entries: List[Dict]):
+    with open(path, "a") as f:
+        f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+_APPENDERS = {
+    FORMAT_JSON: _append_json,
+    FORMAT_JSONL: _append_jsonl,
+}
+
+
+def append_entries(path, entries: List[Dict], fmt: str = FORMAT_JSON):
+    """Append entries to a log file under the file lock, with one fsync."""
+    if not entries:
+        return
+    with locked(path):
+        _APPENDERS[fmt](path, entries)
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits queued entries in batches."""
+
+    def __init__(self, path, fmt: str = FORMAT_JSON, max_batch: int = 1000):
+        if fmt not in _APPENDERS:
+            raise ValueError(f"Unknown log format: {fmt}")
+        self.path = str(path)
+        self.fmt = fmt
+        self.max_batch = max_batch
+        self.commits = 0  # number of fsync'd batches, for benchmarks
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"log-writer:{self.path}", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry: Dict) -> "_Pending":
+        """Queue an entry; returns a handle whose wait() blocks until it is durable."""
+        if self._closed:
+            raise RuntimeError(f"Writer for {self.path} is closed")
+        pending = _Pending()
+        self._queue.put((entry, pending))
+        return pending
+
+    def write(self, entry: Dict):
+        """Queue an entry and block until its batch has been fsync'd."""
+        self.submit(entry).wait()
+
+    def flush(self):
+        """Block until everything submitted so far is durable."""
+        pending = _Pending()
+        self._queue.put((None, pending))
+        pending.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # Drain whatever else is already waiting into the same commit
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            entries = [entry for entry, _ in batch if entry is not None]
+            error = None
+            try:
+                append_entries(self.path, entries, self.fmt)
+                if entries:
+                    self.commits += 1
+            except Exception as e:
+                error = e
+
+            for _, pending in batch:
+                pending.set(error)
+
+            if stop:
+                return
+
+
+class _Pending:
+    """Completion handle for a submitted entry."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._error: Optional[Exception] = None
+
+    def set(self, error: Optional[Exception] = None):
+        self._error = error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("Log write did not complete in time")
+        if self._error is not None:
+            raise self._error
+
+
+_writers: Dict[tuple, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path, fmt: str = FORMAT_JSON) -> GroupCommitWriter:
+    """Shared writer per (file, format), so every thread in a process groups together."""
+    key = (os.path.abspath(path), fmt)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = GroupCommitWriter(path, fmt)
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def close_writers():
+    """Flush and stop every shared writer (also runs at interpreter exit)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
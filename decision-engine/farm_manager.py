@@ -7,12 +7,14 @@ It aggregates data from multiple sources and outputs actionable decisions.
 """
 
 import os
-import json
-import requests
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import Optional, List, Dict
 
+from decision_log import FORMAT_JSON, get_writer
+from rules import RuleBook, get_rulebook
+from weather import CACHE_DIR, Forecast, WeatherForecast, WeatherService, default_providers, total_precip
+
 # Configuration
 THINGSBOARD_URL = os.getenv("THINGSBOARD_URL", "https://thingsboard.cloud")
 THINGSBOARD_TOKEN = os.getenv("THINGSBOARD_TOKEN", "")
@@ -23,13 +25,7 @@ LEAF_API_KEY = os.getenv("LEAF_API_KEY", "")
 FARM_LAT = 41.878  # Des Moines, Iowa area
 FARM_LON = -93.098
 
-# Decision thresholds for corn
-THRESHOLDS = {
-    "soil_temp_min_plant": 50,  # °F - minimum soil temp for planting
-    "soil_moisture_low": 40,    # % - trigger irrigation alert
-    "soil_moisture_high": 80,   # % - stop irrigation
-    "gdd_base_temp": 50,        # °F - base for Growing Degree Days
-}
+# Decision thresholds and the planting window live in rules.json (see rules.py)
 
 @dataclass
 class SensorReading:
@@ -39,14 +35,6 @@ class SensorReading:
     air_temp: float       # °F
     humidity: float       # percentage
 
-@dataclass
-class WeatherForecast:
-    date: datetime
-    high_temp: float
-    low_temp: float
-    precip_chance: float
-    precip_amount: float  # inches
-
 @dataclass
 class FarmDecision:
     timestamp: datetime
@@ -60,9 +48,12 @@ class FarmDecision:
 class FarmManager:
     """Claude's brain for farm management decisions."""
 
-    def __init__(self):
+    def __init__(self, weather: Optional[WeatherService] = None, rules: Optional[RuleBook] = None):
         self.decisions_log = []
         self.gdd_accumulated = 0  # Growing Degree Days
+        self.weather = weather or WeatherService(default_providers(OPENWEATHER_API_KEY), FARM_LAT, FARM_LON,
+                                                 cache_dir=CACHE_DIR)
+        self.rules = rules or get_rulebook()
 
     def get_sensor_data(self) -> Optional[SensorReading]:
         """Fetch latest data from ThingsBoard IoT platform."""
@@ -75,101 +66,47 @@ class FarmManager:
         # response = requests.get(f"{THINGSBOARD_URL}/api/plugins/telemetry/...")
         return None
 
-    def get_weather_forecast(self, days: int = 7) -> List[WeatherForecast]:
-        """Fetch weather forecast from OpenWeatherMap."""
-        if not OPENWEATHER_API_KEY:
-            print("Warning: OpenWeatherMap API not configured yet")
-            return []
-
-        url = f"https://api.openweathermap.org/data/2.5/forecast"
-        params = {
-            "lat": FARM_LAT,
-            "lon": FARM_LON,
-            "appid": OPENWEATHER_API_KEY,
-            "units": "imperial"
-        }
+    def _forecast(self, consensus: bool = False) -> Optional[Forecast]:
+        # Rain amounts drive the planting and irrigation rules, so hedging only
+        # considers providers that report them
+        forecast = self.weather.consensus() if consensus else self.weather.fastest(require_precip=True)
+        if not forecast:
+            print("Warning: no weather provider returned a forecast")
+        return forecast
 
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            forecasts = []
-            for item in data.get("list", []):
-                forecasts.append(WeatherForecast(
-                    date=datetime.fromtimestamp(item["dt"]),
-                    high_temp=item["main"]["temp_max"],
-                    low_temp=item["main"]["temp_min"],
-                    precip_chance=item.get("pop", 0) * 100,
-                    precip_amount=item.get("rain", {}).get("3h", 0) / 25.4  # mm to inches
-                ))
-            return forecasts
-        except Exception as e:
-            print(f"Weather API error: {e}")
-            return []
+    def get_weather_forecast(self, days: int = 7, consensus: bool = False) -> List[WeatherForecast]:
+        """Fetch a daily forecast - fastest healthy provider, or a consensus of several."""
+        forecast = self._forecast(consensus)
+        return forecast.daily()[:days] if forecast else []
 
     def calculate_gdd(self, high_temp: float, low_temp: float) -> float:
         """Calculate Growing Degree Days for corn."""
         avg_temp = (high_temp + low_temp) / 2
-        gdd = max(0, avg_temp - THRESHOLDS["gdd_base_temp"])
+        gdd = max(0, avg_temp - self.rules.thresholds["gdd_base_temp"])
         return gdd
 
     def should_plant(self, sensor_data: Optional[SensorReading],
                      forecast: List[WeatherForecast]) -> FarmDecision:
         """Decide if conditions are right for planting."""
         now = datetime.now()
+        ctx = {"soil_temp": sensor_data.soil_temp if sensor_data else None}
 
-        # Check date window (April 15 - May 18 optimal for Iowa)
-        planting_window_start = datetime(now.year, 4, 15)
-        planting_window_end = datetime(now.year, 5, 18)
-        in_window = planting_window_start <= now <= planting_window_end
-
-        rationale_parts = []
-        can_plant = True
-
-        # Check planting window
-        if not in_window:
-            if now < planting_window_start:
-                rationale_parts.append(f"Before planting window (starts April 15)")
-                can_plant = False
-            else:
-                rationale_parts.append(f"Late in planting window - yields may be reduced")
-        else:
-            rationale_parts.append(f"Within optimal planting window")
-
-        # Check soil temperature
-        if sensor_data:
-            if sensor_data.soil_temp >= THRESHOLDS["soil_temp_min_plant"]:
-                rationale_parts.append(f"Soil temp {sensor_data.soil_temp}°F >= 50°F threshold")
-            else:
-                rationale_parts.append(f"Soil temp {sensor_data.soil_temp}°F below 50°F threshold")
-                can_plant = False
-
-        # Check weather forecast
         if forecast:
             next_5_days = forecast[:5]
-            rain_expected = sum(f.precip_amount for f in next_5_days)
-            avg_temp = sum(f.high_temp for f in next_5_days) / len(next_5_days)
+            ctx["rain_5day"] = total_precip(next_5_days)
+            ctx["avg_high_5day"] = sum(f.high_temp for f in next_5_days) / len(next_5_days)
 
-            if rain_expected > 1.0:
-                rationale_parts.append(f"Heavy rain expected ({rain_expected:.1f}\" in 5 days) - delay planting")
-                can_plant = False
-
-            if avg_temp < 55:
-                rationale_parts.append(f"Cool temps forecast (avg {avg_temp:.0f}°F) - monitor")
-
-        action = "PLANT" if can_plant else "WAIT"
-        priority = "urgent" if can_plant and in_window else "normal"
+        outcome = self.rules.evaluate("planting", ctx, now)
 
         decision = FarmDecision(
             timestamp=now,
             decision_type="planting",
-            action=action,
-            rationale=" | ".join(rationale_parts),
-            priority=priority,
+            action=outcome.outputs["action"],
+            rationale=outcome.rationale,
+            priority=outcome.outputs["priority"],
             data_used={
-                "soil_temp": sensor_data.soil_temp if sensor_data else None,
-                "in_window": in_window,
+                "soil_temp": ctx["soil_temp"],
+                "in_window": self.rules.window(now)["in_window"],
                 "forecast_days": len(forecast)
             }
         )
@@ -181,8 +118,6 @@ class FarmManager:
                         forecast: List[WeatherForecast]) -> FarmDecision:
         """Decide if irrigation is needed."""
         now = datetime.now()
-        rationale_parts = []
-        needs_irrigation = False
 
         if not sensor_data:
             return FarmDecision(
@@ -194,34 +129,21 @@ class FarmManager:
                 data_used={}
             )
 
-        # Check soil moisture
-        if sensor_data.soil_moisture < THRESHOLDS["soil_moisture_low"]:
-            rationale_parts.append(f"Soil moisture {sensor_data.soil_moisture}% below {THRESHOLDS['soil_moisture_low']}% threshold")
-            needs_irrigation = True
-        elif sensor_data.soil_moisture > THRESHOLDS["soil_moisture_high"]:
-            rationale_parts.append(f"Soil moisture {sensor_data.soil_moisture}% adequate - no irrigation needed")
-        else:
-            rationale_parts.append(f"Soil moisture {sensor_data.soil_moisture}% in acceptable range")
-
-        # Check upcoming rain
-        if forecast:
-            rain_48h = sum(f.precip_amount for f in forecast[:16])  # 3-hour intervals
-            if rain_48h > 0.5:
-                rationale_parts.append(f"Rain expected ({rain_48h:.1f}\" in 48h) - hold irrigation")
-                needs_irrigation = False
-
-        action = "IRRIGATE" if needs_irrigation else "HOLD"
-        priority = "urgent" if needs_irrigation and sensor_data.soil_moisture < 30 else "normal"
+        ctx = {
+            "soil_moisture": sensor_data.soil_moisture,
+            "rain_48h": total_precip(forecast[:2]) if forecast else None  # daily periods
+        }
+        outcome = self.rules.evaluate("irrigation", ctx, now)
 
         decision = FarmDecision(
             timestamp=now,
             decision_type="irrigation",
-            action=action,
-            rationale=" | ".join(rationale_parts),
-            priority=priority,
+            action=outcome.outputs["action"],
+            rationale=outcome.rationale,
+            priority=outcome.outputs["priority"],
             data_used={
                 "soil_moisture": sensor_data.soil_moisture,
-                "rain_forecast_48h": rain_48h if forecast else None
+                "rain_forecast_48h": ctx["rain_48h"]
             }
         )
 
@@ -239,17 +161,9 @@ class FarmManager:
             "data": decision.data_used
         }
 
-        # Append to JSON log
-        try:
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            logs = []
-
-        logs.append(log_entry)
-
-        with open(log_file, 'w') as f:
-            json.dump(logs, f, indent=2)
+        # Append to JSON log - locked and group-committed, so concurrent
+        # runs and worker threads never lose each other's entries
+        get_writer(log_file, FORMAT_JSON).write(log_entry)
 
         print(f"[{decision.timestamp}] {decision.decision_type.upper()}: {decision.action}")
         print(f"  Rationale: {decision.rationale}")
@@ -279,13 +193,15 @@ class FarmManager:
         report.append("")
 
         # Weather
-        forecast = self.get_weather_forecast()
-        if forecast:
+        weather = self._forecast()
+        if weather:
             report.append("WEATHER FORECAST (next 5 days):")
-            for f in forecast[:5]:
+            for f in weather.daily()[:5]:
                 report.append(f"  {f.date.strftime('%m/%d')}: {f.low_temp:.0f}-{f.high_temp:.0f}°F, {f.precip_chance:.0f}% rain")
         else:
-            report.append("WEATHER: API not configured")
+            report.append("WEATHER: no provider available")
+        for line in self.weather.report(weather):
+            report.append(f"  provider {line}")
 
         report.append("")
 
@@ -297,23 +213,29 @@ class FarmManager:
         return "\n".join(report)
 
 
-def main():
-    """Main entry point - run daily farm check."""
-    print("🌽 Claude Farm Manager - Starting daily check")
-    print()
-
-    manager = FarmManager()
-
+def run_decisions(manager: FarmManager, log_file: str = "decisions.json") -> List[FarmDecision]:
+    """Make and log today's planting and irrigation decisions."""
     # Get current data
     sensor_data = manager.get_sensor_data()
     forecast = manager.get_weather_forecast()
 
     # Make decisions
-    planting_decision = manager.should_plant(sensor_data, forecast)
-    manager.log_decision(planting_decision)
+    decisions = [
+        manager.should_plant(sensor_data, forecast),
+        manager.should_irrigate(sensor_data, forecast),
+    ]
+    for decision in decisions:
+        manager.log_decision(decision, log_file)
+    return decisions
+
+
+def main():
+    """Main entry point - run daily farm check."""
+    print("🌽 Claude Farm Manager - Starting daily check")
+    print()
 
-    irrigation_decision = manager.should_irrigate(sensor_data, forecast)
-    manager.log_decision(irrigation_decision)
+    manager = FarmManager()
+    run_decisions(manager)
 
     # Generate report
     print(manager.generate_status_report())
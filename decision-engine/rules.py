@@ -0,0 +1,333 @@
+"""
+Proof of Corn - Decision rules
+Loads rules.json and compiles each ruleset into a plain Python function.
+
+The rule file holds every threshold and the planting window in one place.
+Each ruleset declares its inputs, derived values (`let`), ordered rules that
+add notes and flip flags, and outputs chosen by the first matching `when`.
+Expressions are a small, checked subset of Python; thresholds are inlined as
+constants at compile time, and any rule touching an input that is None (no
+sensor yet, no forecast) is skipped. A None input shown in a note or output
+renders as "n/a".
+
+A RuleBook re-reads the file when its mtime changes, so a long-running
+process picks up edits without a restart. A bad edit is reported and the
+previous rules stay in force.
+"""
+
+import os
+import re
+import ast
+import json
+import time
+import threading
+from calendar import month_name
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional
+
+RULES_FILE = os.getenv("FARM_RULES", str(Path(__file__).parent / "rules.json"))
+
+# Expression syntax allowed in `when` / `let`: comparisons, boolean logic, arithmetic
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Name, ast.Load, ast.Constant,
+)
+
+# Format specs allowed in templates: the plain mini-language, no nested fields
+_FORMAT_SPEC = re.compile(r"(?:[^{}]?[<>=^])?[+\- ]?z?#?0?\d*[,_]?(?:\.\d+)?[bcdeEfFgGnosxX%]?")
+
+# Values every ruleset can use, derived from the planting window
+WINDOW_FIELDS = ("in_window", "before_window", "after_window", "days_until_window",
+                 "window_start_label", "window_end_label")
+
+
+class RuleError(ValueError):
+    """The rule file is malformed or uses an unsupported expression."""
+
+
+@dataclass(slots=True)
+class Outcome:
+    outputs: Dict[str, str]
+    notes: List[str]
+    values: Dict = field(default_factory=dict)  # final value of every `let`
+
+    @property
+    def rationale(self) -> str:
+        return self.outputs.get("rationale") or " | ".join(self.notes)
+
+
+class _Missing:
+    """Stands in for a None input inside a template, whatever its format spec."""
+
+    def __format__(self, spec):
+        return "n/a"
+
+    def __str__(self):
+        return "n/a"
+
+    __repr__ = __str__
+
+
+_MISSING = _Missing()
+
+
+class _Compiler:
+    """Turns one ruleset into Python source, then into a function."""
+
+    def __init__(self, name: str, spec: Dict, thresholds: Dict, labels: Dict):
+        self.name = name
+        self.spec = spec
+        self.thresholds = thresholds
+        self.constants = {**thresholds, **labels}  # baked into templates at compile time
+        self.inputs = list(spec.get("inputs", []))
+        self.nullable = set(self.inputs)
+        self.known = set(self.inputs) | set(WINDOW_FIELDS)
+        self.used = set()  # names the generated code reads, so the prologue loads only those
+
+    def expr(self, text: str, where: str) -> str:
+        """Validate an expression and return its source, guarded against None inputs."""
+        try:
+            tree = ast.parse(str(text), mode="eval")
+        except SyntaxError as e:
+            raise RuleError(f"{self.name}.{where}: {e.msg} in {text!r}")
+
+        names = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise RuleError(f"{self.name}.{where}: {type(node).__name__} not allowed in {text!r}")
+            if isinstance(node, ast.Name) and node.id not in self.thresholds:
+                if node.id not in self.known:
+                    raise RuleError(f"{self.name}.{where}: unknown name {node.id!r}")
+                names.add(node.id)
+        self.used |= names
+
+        thresholds = self.thresholds
+
+        class _Inline(ast.NodeTransformer):
+            def visit_Name(self, node):
+                if node.id in thresholds:
+                    return ast.copy_location(ast.Constant(thresholds[node.id]), node)
+                return node
+
+        source = ast.unparse(_Inline().visit(tree).body)
+        guards = [f"{n} is not None" for n in sorted(names & self.nullable)]
+        if guards:
+            return f"({' and '.join(guards)} and ({source}))"
+        return f"({source})"
+
+    def template(self, text: str) -> str:
+        """Source for a note/output value, as an f-string with constants baked in."""
+        parts = []
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise RuleError(f"{self.name}: bad template {text!r}: {e}")
+        for literal, name, spec, conversion in parsed:
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if name is None:
+                continue
+            if not _FORMAT_SPEC.fullmatch(spec or "") or conversion not in (None, "r", "s", "a"):
+                raise RuleError(f"{self.name}: unsupported format for {name!r} in template {text!r}")
+            if name in self.constants:
+                value = format(self.constants[name], spec or "")
+                parts.append(value.replace("{", "{{").replace("}", "}}"))
+            elif name in self.known:
+                self.used.add(name)
+                conv = f"!{conversion}" if conversion else ""
+                field = f"(_MISSING if {name} is None else {name})" if name in self.nullable else name
+                parts.append(f"{{{field}{conv}{':' + spec if spec else ''}}}")
+            else:
+                raise RuleError(f"{self.name}: unknown name {name!r} in template {text!r}")
+        if all(name is None for _, name, _, _ in parsed):
+            return repr(text)
+        return "f" + repr("".join(parts))
+
+    def source(self) -> str:
+        lines = ["    notes = []"]
+
+        lets = self.spec.get("let", {})
+        for name, text in lets.items():
+            if not name.isidentifier() or name in self.thresholds:
+                raise RuleError(f"{self.name}.let: bad name {name!r}")
+            src = self.expr(text, f"let.{name}")
+            self.known.add(name)
+            lines.append(f"    {name} = {src}")
+
+        for i, rule in enumerate(self.spec.get("rules", [])):
+            if "when" not in rule:
+                raise RuleError(f"{self.name}.rules[{i}]: missing 'when'")
+            src = self.expr(rule["when"], f"rules[{i}]")
+            lines.append(f"    if {src}:")
+            if "note" in rule:
+                lines.append(f"        notes.append({self.template(rule['note'])})")
+            for name, value in rule.get("set", {}).items():
+                if name not in lets:
+                    raise RuleError(f"{self.name}.rules[{i}]: 'set' target {name!r} is not a let")
+                lines.append(f"        {name} = {value!r}")
+            if "note" not in rule and not rule.get("set"):
+                lines.append("        pass")
+
+        outputs = self.spec.get("outputs", {})
+        for name, choices in outputs.items():
+            if not name.isidentifier():
+                raise RuleError(f"{self.name}.outputs: bad name {name!r}")
+            lines.append(f"    {name} = None")
+            keyword = "if"
+            for j, choice in enumerate(choices):
+                value = self.template(str(choice["value"]))
+                if "when" in choice:
+                    src = self.expr(choice["when"], f"outputs.{name}[{j}]")
+                    lines.append(f"    {keyword} {src}:")
+                    keyword = "elif"
+                else:
+                    lines.append("    else:" if keyword == "elif" else "    if True:")
+                lines.append(f"        {name} = {value}")
+                if "when" not in choice:
+                    break
+            self.known.add(name)
+
+        out = ", ".join(f"{n!r}: {n}" for n in outputs)
+        values = ", ".join(f"{n!r}: {n}" for n in lets)
+        lines.append(f"    return _Outcome({{{out}}}, notes, {{{values}}})")
+
+        prologue = [f"def _ruleset_{self.name}(ctx, window):"]
+        prologue += [f"    {n} = ctx.get({n!r})" for n in self.inputs]
+        prologue += [f"    {n} = window[{n!r}]" for n in WINDOW_FIELDS if n in self.used]
+        return "\n".join(prologue + lines) + "\n"
+
+    def compile(self) -> Callable:
+        source = self.source()
+        namespace = {"__builtins__": {}, "_Outcome": Outcome, "_MISSING": _MISSING}
+        exec(compile(source, f"<rules:{self.name}>", "exec"), namespace)
+        fn = namespace[f"_ruleset_{self.name}"]
+        fn.source = source
+        return fn
+
+
+def _month_day(value, key: str):
+    try:
+        month, day = value
+        datetime(2000, month, day)
+    except (TypeError, ValueError):
+        raise RuleError(f"planting_window.{key}: expected [month, day], got {value!r}")
+    return month, day
+
+
+class RuleSet:
+    """Everything compiled from one version of the rule file."""
+
+    def __init__(self, spec: Dict):
+        window = spec.get("planting_window", {})
+        self.window_start = _month_day(window.get("start"), "start")
+        self.window_end = _month_day(window.get("end"), "end")
+        self.thresholds = dict(spec.get("thresholds", {}))
+        for name, value in self.thresholds.items():
+            if not name.isidentifier() or not isinstance(value, (int, float)):
+                raise RuleError(f"thresholds.{name}: expected a number, got {value!r}")
+
+        self.labels = {
+            "window_start_label": f"{month_name[self.window_start[0]]} {self.window_start[1]}",
+            "window_end_label": f"{month_name[self.window_end[0]]} {self.window_end[1]}",
+        }
+        self.functions: Dict[str, Callable] = {}
+        self._window = None  # (now, values) of the last window() call
+        for name, ruleset in spec.get("rulesets", {}).items():
+            if not name.isidentifier():
+                raise RuleError(f"rulesets: bad name {name!r}")
+            self.functions[name] = _Compiler(name, ruleset, self.thresholds, self.labels).compile()
+
+    def window(self, now: datetime) -> Dict:
+        """Planting-window values for `now`, shared by every ruleset."""
+        cached = self._window
+        if cached and cached[0] == now:
+            return cached[1]
+        start = datetime(now.year, *self.window_start)
+        end = datetime(now.year, *self.window_end)
+        window = {
+            "in_window": start <= now <= end,
+            "before_window": now < start,
+            "after_window": now > end,
+            "days_until_window": (start - now).days if now < start else 0,
+            **self.labels,
+        }
+        self._window = (now, window)
+        return window
+
+
+class RuleBook:
+    """Compiled rules for a file on disk, recompiled when the file changes."""
+
+    def __init__(self, path: str = RULES_FILE, check_interval: float = 1.0):
+        self.path = str(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self.rules = self._load()
+
+    def _load(self) -> RuleSet:
+        self._mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as f:
+            try:
+                spec = json.load(f)
+            except json.JSONDecodeError as e:
+                raise RuleError(f"{self.path}: {e}")
+        return RuleSet(spec)
+
+    def reload_if_changed(self) -> bool:
+        """Recompile if the file changed; keep the old rules if the new ones are bad."""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                if os.stat(self.path).st_mtime_ns == self._mtime:
+                    return False
+                self.rules = self._load()
+            except (OSError, RuleError) as e:
+                print(f"Warning: keeping previous rules, could not reload {self.path}: {e}")
+                return False
+            print(f"Reloaded rules from {self.path}")
+            return True
+
+    @property
+    def thresholds(self) -> Dict:
+        self.reload_if_changed()
+        return self.rules.thresholds
+
+    def window(self, now: Optional[datetime] = None) -> Dict:
+        self.reload_if_changed()
+        return self.rules.window(now or datetime.now())
+
+    def evaluate(self, ruleset: str, ctx: Dict, now: Optional[datetime] = None) -> Outcome:
+        """Evaluate one ruleset for one field."""
+        self.reload_if_changed()
+        rules = self.rules
+        return rules.functions[ruleset](ctx, rules.window(now or datetime.now()))
+
+    def evaluate_batch(self, ruleset: str, contexts: Iterable[Dict],
+                       now: Optional[datetime] = None) -> List[Outcome]:
+        """Evaluate one ruleset for many fields against a single rules snapshot."""
+        self.reload_if_changed()
+        rules = self.rules
+        fn = rules.functions[ruleset]
+        window = rules.window(now or datetime.now())
+        return [fn(ctx, window) for ctx in contexts]
+
+
+_rulebooks: Dict[str, RuleBook] = {}
+_rulebooks_lock = threading.Lock()
+
+
+def get_rulebook(path: str = RULES_FILE) -> RuleBook:
+    """Shared RuleBook per file, so every caller sees the same reloads."""
+    key = os.path.abspath(path)
+    with _rulebooks_lock:
+        if key not in _rulebooks:
+            _rulebooks[key] = RuleBook(path)
+        return _rulebooks[key]
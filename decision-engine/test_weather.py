@@ -10,9 +10,10 @@ Usage:
 
 import os
 import sys
-import json
 import requests
-from datetime import datetime
+
+from rules import get_rulebook
+from weather import CACHE_DIR, OpenWeatherOneCall, WeatherService, default_providers
 
 # Target location: Des Moines, Iowa area (central Iowa)
 FARM_LAT = 41.5868  # Des Moines latitude
@@ -26,60 +27,47 @@ def test_current_weather(api_key: str):
     print("="*60)
 
     # Using One Call API 3.0 (what Seth subscribed to)
-    url = "https://api.openweathermap.org/data/3.0/onecall"
-    params = {
-        "lat": FARM_LAT,
-        "lon": FARM_LON,
-        "appid": api_key,
-        "units": "imperial",
-        "exclude": "minutely,hourly"  # Just get current + daily for this test
-    }
-
-    response = requests.get(url, params=params)
-
-    if response.status_code == 200:
-        data = response.json()
-        current = data.get('current', {})
-        print(f"Temperature: {current.get('temp', 'N/A')}°F")
-        print(f"Feels like: {current.get('feels_like', 'N/A')}°F")
-        print(f"Humidity: {current.get('humidity', 'N/A')}%")
-        print(f"Conditions: {current.get('weather', [{}])[0].get('description', 'N/A')}")
-        print(f"Wind: {current.get('wind_speed', 'N/A')} mph")
-        print(f"UV Index: {current.get('uvi', 'N/A')}")
-        return data
-    elif response.status_code == 401:
-        print("Error 401: API key not activated yet (wait a few minutes)")
-        print("Or check your key at: https://home.openweathermap.org/api_keys")
+    try:
+        forecast = OpenWeatherOneCall(api_key).fetch(FARM_LAT, FARM_LON)
+    except requests.RequestException as e:
+        if e.response is not None and e.response.status_code == 401:
+            print("Error 401: API key not activated yet (wait a few minutes)")
+            print("Or check your key at: https://home.openweathermap.org/api_keys")
+        else:
+            print(f"Error: {e}")
         return None
-    else:
-        print(f"Error: {response.status_code}")
-        print(response.text)
+
+    current = forecast.current
+    print(f"Temperature: {current.temp}°F")
+    print(f"Feels like: {current.feels_like}°F")
+    print(f"Humidity: {current.humidity}%")
+    print(f"Conditions: {current.conditions}")
+    print(f"Wind: {current.wind_speed} mph")
+    print(f"UV Index: {current.uvi if current.uvi is not None else 'N/A'}")
+    return forecast
+
+
+def _fetch_onecall(api_key: str):
+    try:
+        return OpenWeatherOneCall(api_key).fetch(FARM_LAT, FARM_LON)
+    except requests.RequestException as e:
+        print(f"Error: {e}")
         return None
 
 
-def test_5day_forecast(api_key: str, onecall_data=None):
+def test_5day_forecast(api_key: str, forecast=None):
     """Test 8-day forecast from One Call API 3.0."""
     print("\n" + "="*60)
     print("8-DAY FORECAST (One Call API 3.0)")
     print("="*60)
 
-    if onecall_data is None:
+    if forecast is None:
         # Fetch if not already fetched
-        url = "https://api.openweathermap.org/data/3.0/onecall"
-        params = {
-            "lat": FARM_LAT,
-            "lon": FARM_LON,
-            "appid": api_key,
-            "units": "imperial",
-            "exclude": "minutely,hourly"
-        }
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
-            print(f"Error: {response.status_code}")
+        forecast = _fetch_onecall(api_key)
+        if forecast is None:
             return False
-        onecall_data = response.json()
 
-    daily = onecall_data.get('daily', [])
+    daily = forecast.daily()
     if not daily:
         print("No daily forecast data available")
         return False
@@ -90,65 +78,47 @@ def test_5day_forecast(api_key: str, onecall_data=None):
     print("-" * 60)
 
     for day in daily[:8]:
-        dt = datetime.fromtimestamp(day['dt'])
-        date_str = dt.strftime("%a %m/%d")
-        high = day['temp']['max']
-        low = day['temp']['min']
-        rain = day.get('rain', 0)  # mm
-        rain_inches = rain / 25.4
-        pop = day.get('pop', 0) * 100  # probability of precipitation
-        condition = day.get('weather', [{}])[0].get('main', 'N/A')
-
-        print(f"  {date_str}: {low:.0f}°F - {high:.0f}°F | {pop:.0f}% chance | {rain_inches:.2f}\" | {condition}")
+        date_str = day.date.strftime("%a %m/%d")
+        print(f"  {date_str}: {day.low_temp:.0f}°F - {day.high_temp:.0f}°F | "
+              f"{day.precip_chance:.0f}% chance | {day.precip_amount:.2f}\" | {day.conditions}")
 
     return True
 
 
-def test_planting_conditions(api_key: str, onecall_data=None):
+def test_planting_conditions(api_key: str, forecast=None):
     """Check if conditions are suitable for corn planting."""
     print("\n" + "="*60)
     print("PLANTING CONDITIONS CHECK")
     print("="*60)
 
-    if onecall_data is None:
-        url = "https://api.openweathermap.org/data/3.0/onecall"
-        params = {
-            "lat": FARM_LAT,
-            "lon": FARM_LON,
-            "appid": api_key,
-            "units": "imperial",
-            "exclude": "minutely,hourly"
-        }
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
+    if forecast is None:
+        forecast = _fetch_onecall(api_key)
+        if forecast is None:
             print("Failed to get weather data")
             return False
-        onecall_data = response.json()
 
-    current_temp = onecall_data.get('current', {}).get('temp', 0)
+    current_temp = forecast.current.temp
 
-    # Check planting window
-    now = datetime.now()
-    planting_start = datetime(now.year, 4, 11)
-    planting_end = datetime(now.year, 5, 18)
-    in_window = planting_start <= now <= planting_end
+    # Planting window and requirements for corn (shared with daily_check.py)
+    rules = get_rulebook()
+    window = rules.window()
+    in_window = window["in_window"]
+    start, end = window["window_start_label"], window["window_end_label"]
 
-    # Planting requirements for corn
-    SOIL_TEMP_THRESHOLD = 50  # °F
-    AIR_TEMP_PROXY = 50  # Using air temp as proxy until we have soil sensors
+    SOIL_TEMP_THRESHOLD = rules.thresholds["soil_temp_min_plant"]  # °F
+    AIR_TEMP_PROXY = SOIL_TEMP_THRESHOLD  # Using air temp as proxy until we have soil sensors
 
     print(f"Current air temperature: {current_temp}°F")
     print(f"Soil temp threshold: {SOIL_TEMP_THRESHOLD}°F (using air temp as proxy)")
     print()
 
     print("Planting Window Check:")
-    if now < planting_start:
-        days_until = (planting_start - now).days
-        print(f"  ❌ Before window - {days_until} days until April 11")
-    elif now > planting_end:
+    if window["before_window"]:
+        print(f"  ❌ Before window - {window['days_until_window']} days until {start}")
+    elif window["after_window"]:
         print(f"  ⚠️  Past optimal window - yields may be reduced")
     else:
-        print(f"  ✓ Within optimal planting window (April 11 - May 18)")
+        print(f"  ✓ Within optimal planting window ({start} - {end})")
 
     print()
     print("Temperature Check:")
@@ -169,6 +139,31 @@ def test_planting_conditions(api_key: str, onecall_data=None):
     return True
 
 
+def test_all_providers(api_key: str):
+    """Fan out to every provider: fastest answer, then a consensus."""
+    print("\n" + "="*60)
+    print("ALL PROVIDERS (hedged + consensus)")
+    print("="*60)
+
+    service = WeatherService(default_providers(api_key), FARM_LAT, FARM_LON, cache_dir=CACHE_DIR)
+    fastest = service.fastest(require_current=True, require_precip=True)
+    print(f"Fastest healthy provider: {fastest.provider if fastest else 'none'}")
+
+    merged = service.consensus()
+    if merged:
+        print(f"Consensus from: {', '.join(merged.sources) or merged.provider}")
+        for day in merged.daily()[:5]:
+            rain = f"{day.precip_amount:.2f}\"" if day.precip_amount is not None else "rain n/a"
+            print(f"  {day.date.strftime('%a %m/%d')}: {day.low_temp:.0f}°F - {day.high_temp:.0f}°F | {rain} | {day.conditions}")
+
+    print()
+    print("Provider latency:")
+    for line in service.report(merged):
+        print(f"  {line}")
+
+    return merged is not None
+
+
 def main():
     api_key = os.getenv("OPENWEATHER_API_KEY")
 
@@ -199,9 +194,11 @@ def main():
 
     # Run tests
     success = True
-    success = test_current_weather(api_key) and success
-    success = test_5day_forecast(api_key) and success
-    success = test_planting_conditions(api_key) and success
+    forecast = test_current_weather(api_key)
+    success = forecast is not None and success
+    success = test_5day_forecast(api_key, forecast) and success
+    success = test_planting_conditions(api_key, forecast) and success
+    success = test_all_providers(api_key) and success
 
     print()
     print("="*60)
@@ -0,0 +1,668 @@
+"""
+Proof of Corn - Weather providers
+One forecast type for every weather source the decision engine can use.
+
+Each provider fetches and parses its own API into a `Forecast`. A
+`WeatherService` fans requests out across providers concurrently and either
+returns the fastest healthy answer (hedged requests) or merges several
+answers into a consensus forecast. Per-provider latency is tracked so slow
+or failing providers drift to the back of the queue on their own, and come
+forward again for a retry as their stats age; with a cache directory the
+stats are saved there so they survive between runs.
+
+Providers declare what they can report. Callers that need real current
+conditions or rain amounts say so, and providers that cannot supply them are
+left out instead of filling the gaps with zeros. All dates are the farm's
+local time, whatever time zone the host runs in.
+
+With a cache directory and max_age, a fresh enough forecast on disk is
+returned as-is. Heavy imports (requests, concurrent.futures, statistics) are
+deferred until a provider is actually called, so a cache hit stays cheap.
+"""
+
+import os
+import json
+import time
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MM_PER_INCH = 25.4
+REQUEST_TIMEOUT = 10  # seconds, per HTTP call
+CACHE_DIR = os.getenv("FARM_CACHE_DIR", str(Path(__file__).parent / ".cache"))
+STATS_FILE = "provider_stats.json"  # in the cache directory
+STATS_HALF_LIFE = 6 * 3600  # seconds for an unrefreshed latency estimate to halve
+
+
+@dataclass
+class WeatherForecast:
+    date: datetime                  # farm local time, naive
+    high_temp: float
+    low_temp: float
+    precip_chance: float
+    precip_amount: Optional[float]  # inches; None when the provider doesn't report amounts
+    conditions: str = "unknown"     # short description, e.g. "Rain"
+
+
+@dataclass
+class CurrentConditions:
+    temp: float = 0           # °F
+    feels_like: float = 0     # °F
+    humidity: float = 0       # percentage
+    conditions: str = "unknown"
+    wind_speed: float = 0     # mph
+    uvi: Optional[float] = None  # UV index; None when the provider doesn't report it
+
+
+@dataclass
+class Forecast:
+    provider: str
+    fetched_at: datetime
+    periods: List[WeatherForecast]
+    current: Optional[CurrentConditions] = None
+    sources: List[str] = field(default_factory=list)  # providers merged into a consensus
+    from_cache: bool = False  # read back from the on-disk cache rather than fetched
+
+    @property
+    def healthy(self) -> bool:
+        return bool(self.periods)
+
+    @property
+    def has_precip_amounts(self) -> bool:
+        return all(p.precip_amount is not None for p in self.periods)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        del data["from_cache"]
+        data["fetched_at"] = self.fetched_at.isoformat()
+        for p in data["periods"]:
+            p["date"] = p["date"].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Forecast":
+        periods = [WeatherForecast(**{**p, "date": datetime.fromisoformat(p["date"])})
+                   for p in data["periods"]]
+        current = CurrentConditions(**data["current"]) if data.get("current") else None
+        return cls(data["provider"], datetime.fromisoformat(data["fetched_at"]),
+                   periods, current, data.get("sources", []))
+
+    def daily(self) -> List[WeatherForecast]:
+        """Collapse sub-daily periods (e.g. 3-hour) into one entry per day."""
+        days: Dict = {}
+        conditions: Dict = {}  # day -> every period's conditions, for the most common one
+        for p in self.periods:
+            day = p.date.replace(hour=0, minute=0, second=0, microsecond=0)
+            conditions.setdefault(day, []).append(p.conditions)
+            if day not in days:
+                days[day] = WeatherForecast(day, p.high_temp, p.low_temp, p.precip_chance, p.precip_amount)
+            else:
+                d = days[day]
+                d.high_temp = max(d.high_temp, p.high_temp)
+                d.low_temp = min(d.low_temp, p.low_temp)
+                d.precip_chance = max(d.precip_chance, p.precip_chance)
+                if d.precip_amount is None or p.precip_amount is None:
+                    d.precip_amount = None
+                else:
+                    d.precip_amount += p.precip_amount
+        for day, d in days.items():
+            d.conditions = _most_common(conditions[day])
+        return [days[day] for day in sorted(days)]
+
+
+def total_precip(periods: List[WeatherForecast]) -> Optional[float]:
+    """Rain over `periods` in inches, or None if any period's amount is unknown."""
+    amounts = [p.precip_amount for p in periods]
+    return None if None in amounts else sum(amounts)
+
+
+def _most_common(values: List[str]) -> str:
+    """Most frequent known value, earliest first on ties."""
+    known = [v for v in values if v != "unknown"]
+    return max(known, key=known.count) if known else "unknown"
+
+
+def _farm_time(timestamp: int, utc_offset: int) -> datetime:
+    """Unix timestamp -> naive farm local time, given the farm's UTC offset in seconds."""
+    return datetime.fromtimestamp(timestamp + utc_offset, timezone.utc).replace(tzinfo=None)
+
+
+class WeatherProvider:
+    """Base class: subclasses implement fetch() for one API."""
+
+    name = "base"
+    has_current = True         # reports observed current conditions
+    has_precip_amounts = True  # reports rain amounts, not just chances
+
+    def is_configured(self) -> bool:
+        return True
+
+    def fetch(self, lat: float, lon: float) -> Forecast:
+        raise NotImplementedError
+
+    def _get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Dict:
+        import requests
+
+        response = requests.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+
+class OpenWeatherForecast(WeatherProvider):
+    """OpenWeatherMap 2.5 /forecast - 5 days in 3-hour steps."""
+
+    name = "openweather-2.5"
+    has_current = False
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def fetch(self, lat: float, lon: float) -> Forecast:
+        data = self._get("https://api.openweathermap.org/data/2.5/forecast", {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key,
+            "units": "imperial"
+        })
+        return self.parse(data)
+
+    def parse(self, data: Dict) -> Forecast:
+        utc_offset = data.get("city", {}).get("timezone", 0)
+        periods = []
+        for item in data.get("list", []):
+            periods.append(WeatherForecast(
+                date=_farm_time(item["dt"], utc_offset),
+                high_temp=item["main"]["temp_max"],
+                low_temp=item["main"]["temp_min"],
+                precip_chance=item.get("pop", 0) * 100,
+                precip_amount=item.get("rain", {}).get("3h", 0) / MM_PER_INCH,
+                conditions=item.get("weather", [{}])[0].get("main", "unknown")
+            ))
+        return Forecast(self.name, datetime.now(), periods)
+
+
+class OpenWeatherOneCall(WeatherProvider):
+    """OpenWeatherMap One Call 3.0 - current conditions plus 8 daily periods."""
+
+    name = "openweather-3.0"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def fetch(self, lat: float, lon: float) -> Forecast:
+        data = self._get("https://api.openweathermap.org/data/3.0/onecall", {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key,
+            "units": "imperial",
+            "exclude": "minutely,hourly"
+        })
+        return self.parse(data)
+
+    def parse(self, data: Dict) -> Forecast:
+        current = data.get("current", {})
+        utc_offset = data.get("timezone_offset", 0)
+        periods = []
+        for day in data.get("daily", []):
+            periods.append(WeatherForecast(
+                date=_farm_time(day["dt"], utc_offset),
+                high_temp=day.get("temp", {}).get("max", 0),
+                low_temp=day.get("temp", {}).get("min", 0),
+                precip_chance=day.get("pop", 0) * 100,
+                precip_amount=day.get("rain", 0) / MM_PER_INCH,
+                conditions=day.get("weather", [{}])[0].get("main", "unknown")
+            ))
+        return Forecast(self.name, datetime.now(), periods, CurrentConditions(
+            temp=current.get("temp", 0),
+            feels_like=current.get("feels_like", 0),
+            humidity=current.get("humidity", 0),
+            conditions=current.get("weather", [{}])[0].get("description", "unknown"),
+            wind_speed=current.get("wind_speed", 0),
+            uvi=current.get("uvi")
+        ))
+
+
+class OpenMeteo(WeatherProvider):
+    """Open-Meteo - free, no API key, current conditions plus daily periods."""
+
+    name = "open-meteo"
+
+    # WMO weather codes -> short description (subset Open-Meteo returns)
+    WEATHER_CODES = {
+        0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+        45: "fog", 48: "rime fog", 51: "light drizzle", 53: "drizzle", 55: "dense drizzle",
+        61: "light rain", 63: "rain", 65: "heavy rain", 71: "light snow", 73: "snow",
+        75: "heavy snow", 80: "rain showers", 81: "rain showers", 82: "violent rain showers",
+        85: "snow showers", 86: "snow showers", 95: "thunderstorm", 96: "thunderstorm with hail",
+        99: "thunderstorm with hail",
+    }
+
+    def fetch(self, lat: float, lon: float) -> Forecast:
+        data = self._get("https://api.open-meteo.com/v1/forecast", {
+            "latitude": lat,
+            "longitude": lon,
+            "current": "temperature_2m,apparent_temperature,relative_humidity_2m,wind_speed_10m,weather_code,uv_index",
+            "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max,weather_code",
+            "temperature_unit": "fahrenheit",
+            "wind_speed_unit": "mph",
+            "precipitation_unit": "inch",
+            "timezone": "auto"  # dates come back in the farm's local time
+        })
+        return self.parse(data)
+
+    def parse(self, data: Dict) -> Forecast:
+        current = data.get("current", {})
+        daily = data.get("daily", {})
+        days = daily.get("time", [])
+        highs = daily.get("temperature_2m_max") or [0] * len(days)
+        lows = daily.get("temperature_2m_min") or [0] * len(days)
+        chances = daily.get("precipitation_probability_max") or [0] * len(days)
+        amounts = daily.get("precipitation_sum") or [0] * len(days)
+        codes = daily.get("weather_code") or [None] * len(days)
+        periods = []
+        for day, high, low, chance, amount, code in zip(days, highs, lows, chances, amounts, codes):
+            periods.append(WeatherForecast(
+                date=datetime.fromisoformat(day),
+                high_temp=high or 0,
+                low_temp=low or 0,
+                precip_chance=chance or 0,
+                precip_amount=amount or 0,
+                conditions=self.WEATHER_CODES.get(code, "unknown")
+            ))
+        return Forecast(self.name, datetime.now(), periods, CurrentConditions(
+            temp=current.get("temperature_2m", 0),
+            feels_like=current.get("apparent_temperature", 0),
+            humidity=current.get("relative_humidity_2m", 0),
+            conditions=self.WEATHER_CODES.get(current.get("weather_code"), "unknown"),
+            wind_speed=current.get("wind_speed_10m", 0),
+            uvi=current.get("uv_index")
+        ))
+
+
+class NationalWeatherService(WeatherProvider):
+    """api.weather.gov - free, US only, day/night periods.
+    No rain amounts and no observed current conditions, only forecasts."""
+
+    name = "nws"
+    has_current = False
+    has_precip_amounts = False
+    HEADERS = {"User-Agent": "proof-of-corn decision engine", "Accept": "application/geo+json"}
+
+    def fetch(self, lat: float, lon: float) -> Forecast:
+        point = self._get(f"https://api.weather.gov/points/{lat:.4f},{lon:.4f}", headers=self.HEADERS)
+        data = self._get(point["properties"]["forecast"], headers=self.HEADERS)
+        return self.parse(data)
+
+    def parse(self, data: Dict) -> Forecast:
+        raw = data.get("properties", {}).get("periods", [])
+        periods = []
+        for p in raw:
+            temp = p.get("temperature", 0)
+            if p.get("temperatureUnit") == "C":
+                temp = temp * 9 / 5 + 32
+            # startTime carries the forecast point's own UTC offset, so its
+            # wall-clock part is already the farm's local time
+            periods.append(WeatherForecast(
+                date=datetime.fromisoformat(p["startTime"]).replace(tzinfo=None),
+                high_temp=temp,
+                low_temp=temp,
+                precip_chance=(p.get("probabilityOfPrecipitation") or {}).get("value") or 0,
+                precip_amount=None,
+                conditions=p.get("shortForecast") or "unknown"
+            ))
+        return Forecast(self.name, datetime.now(), periods)
+
+
+def consensus(forecasts: List[Forecast]) -> Forecast:
+    """Merge several forecasts into one daily forecast using per-day medians.
+    Values a provider doesn't report (None) are left out of the median."""
+    from statistics import median as _median
+
+    def median(values):
+        known = [v for v in values if v is not None]
+        return _median(known) if known else None
+
+    by_day: Dict = {}
+    for f in forecasts:
+        for d in f.daily():
+            by_day.setdefault(d.date, []).append(d)
+
+    periods = [
+        WeatherForecast(
+            date=day,
+            high_temp=median(d.high_temp for d in days),
+            low_temp=median(d.low_temp for d in days),
+            precip_chance=median(d.precip_chance for d in days),
+            precip_amount=median(d.precip_amount for d in days),
+            conditions=_most_common([d.conditions for d in days])
+        )
+        for day, days in sorted(by_day.items())
+    ]
+
+    currents = [f.current for f in forecasts if f.current]
+    current = None
+    if currents:
+        current = CurrentConditions(
+            temp=median(c.temp for c in currents),
+            feels_like=median(c.feels_like for c in currents),
+            humidity=median(c.humidity for c in currents),
+            conditions=currents[0].conditions,
+            wind_speed=median(c.wind_speed for c in currents),
+            uvi=median(c.uvi for c in currents)
+        )
+
+    sources = [f.provider for f in forecasts]
+    return Forecast("consensus", datetime.now(), periods, current, sources)
+
+
+class ProviderStats:
+    """Exponentially weighted latency for one provider; failures count as slow.
+
+    A provider that falls behind is rarely called again, so its estimate would
+    never recover. The estimate therefore decays as it ages (half_life), and a
+    provider demoted by an old failure eventually ranks first and gets re-timed.
+    """
+
+    def __init__(self, alpha: float = 0.3, failure_penalty: float = REQUEST_TIMEOUT,
+                 half_life: float = STATS_HALF_LIFE):
+        self.alpha = alpha
+        self.failure_penalty = failure_penalty
+        self.half_life = half_life
+        self.latency: Optional[float] = None  # seconds, EWMA as of `updated`
+        self.updated = 0.0                    # wall clock of the last sample
+        self.successes = 0
+        self.failures = 0
+
+    def estimate(self, now: Optional[float] = None) -> Optional[float]:
+        """Latency to rank by: the EWMA, decayed for the time since its last sample."""
+        if self.latency is None:
+            return None
+        age = max(0.0, (now or time.time()) - self.updated)
+        return self.latency * 0.5 ** (age / self.half_life)
+
+    def _update(self, sample: float):
+        now = time.time()
+        current = self.estimate(now)
+        self.latency = sample if current is None else self.alpha * sample + (1 - self.alpha) * current
+        self.updated = now
+
+    def record(self, latency: float, ok: bool):
+        self._update(latency if ok else max(latency, self.failure_penalty))
+        if ok:
+            self.successes += 1
+        else:
+            self.failures += 1
+
+    def record_abandoned(self, elapsed: float):
+        """A call we stopped waiting for: its latency is at least `elapsed`."""
+        current = self.estimate()
+        if current is None or elapsed > current:
+            self._update(elapsed)
+
+    def to_dict(self) -> Dict:
+        return {"latency": self.latency, "updated": self.updated,
+                "successes": self.successes, "failures": self.failures}
+
+    def load(self, data: Dict):
+        self.latency = data.get("latency")
+        self.updated = data.get("updated", 0.0)  # files without it are treated as long stale
+        self.successes = data.get("successes", 0)
+        self.failures = data.get("failures", 0)
+
+
+def _start(fn, *args):
+    """Run fn on a daemon thread and return a Future for it. Daemon threads
+    don't hold the interpreter open, so abandoned requests can't delay exit."""
+    from concurrent.futures import Future
+
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"weather:{fn.__name__}", daemon=True).start()
+    return future
+
+
+class WeatherService:
+    """Fan-out over several providers with hedging or consensus."""
+
+    def __init__(self, providers: List[WeatherProvider], lat: float, lon: float,
+                 cache_dir: Optional[str] = None, max_age: float = 0):
+        self.providers = [p for p in providers if p.is_configured()]
+        self.lat = lat
+        self.lon = lon
+        self.cache_dir = cache_dir
+        self.max_age = max_age  # seconds; 0 disables the cache
+        self.stats = {p.name: ProviderStats() for p in self.providers}
+        self._lock = threading.Lock()
+        self._load_stats()
+
+    def _stats_file(self) -> Optional[Path]:
+        return Path(self.cache_dir) / STATS_FILE if self.cache_dir else None
+
+    def _load_stats(self):
+        path = self._stats_file()
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+            for name, stats in self.stats.items():
+                if isinstance(saved.get(name), dict):
+                    stats.load(saved[name])
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _save_stats(self):
+        path = self._stats_file()
+        if not path:
+            return
+        from decision_log import write_json_atomic
+
+        with self._lock:
+            data = {name: stats.to_dict() for name, stats in self.stats.items()}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(path, data)
+        except OSError as e:
+            print(f"Warning: could not save provider stats to {path}: {e}")
+
+    def _cache_file(self, mode: str) -> Path:
+        return Path(self.cache_dir) / f"{mode}_{self.lat:.4f}_{self.lon:.4f}.json"
+
+    def _load_cache(self, mode: str) -> Optional[Forecast]:
+        if not self.cache_dir or self.max_age <= 0:
+            return None
+        try:
+            with open(self._cache_file(mode)) as f:
+                forecast = Forecast.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if (datetime.now() - forecast.fetched_at).total_seconds() > self.max_age:
+            return None
+        forecast.from_cache = True
+        return forecast
+
+    def _save_cache(self, mode: str, forecast: Optional[Forecast]) -> Optional[Forecast]:
+        """Keep `forecast` for later runs. A cache we can't write costs the next
+        run an API call, so it's a warning, never a reason to lose this forecast."""
+        if forecast and self.cache_dir and self.max_age > 0:
+            from decision_log import write_json_atomic
+
+            path = self._cache_file(mode)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                write_json_atomic(path, forecast.to_dict(), indent=None)
+            except OSError as e:
+                print(f"Warning: could not cache forecast in {path}: {e}")
+        return forecast
+
+    def ranked(self, require_current: bool = False, require_precip: bool = False) -> List[WeatherProvider]:
+        """Providers fastest-first; untried providers keep their configured order up front.
+        Providers that can't report what the caller requires are left out."""
+        providers = [p for p in self.providers
+                     if (p.has_current or not require_current)
+                     and (p.has_precip_amounts or not require_precip)]
+        with self._lock:
+            order = {p.name: i for i, p in enumerate(self.providers)}
+            now = time.time()
+            estimates = {p.name: self.stats[p.name].estimate(now) for p in providers}
+            return sorted(providers, key=lambda p: (
+                estimates[p.name] is not None,
+                estimates[p.name] or 0,
+                order[p.name]
+            ))
+
+    def _call(self, provider: WeatherProvider, call: Dict) -> Optional[Forecast]:
+        try:
+            forecast = provider.fetch(self.lat, self.lon)
+            ok = forecast.healthy
+        except Exception as e:
+            print(f"Weather provider {provider.name} failed: {e}")
+            forecast, ok = None, False
+        with self._lock:
+            if not call["abandoned"]:
+                self.stats[provider.name].record(time.perf_counter() - call["start"], ok)
+        return forecast if ok else None
+
+    def _submit(self, provider: WeatherProvider, calls: Dict):
+        call = {"provider": provider, "start": time.perf_counter(), "abandoned": False}
+        future = _start(self._call, provider, call)
+        calls[future] = call
+        return future
+
+    def _finish(self, calls: Dict):
+        """Stop waiting for calls still in flight (counting the wait so far
+        against them), then persist the stats."""
+        now = time.perf_counter()
+        with self._lock:
+            for future, call in calls.items():
+                if not future.done():
+                    call["abandoned"] = True
+                    self.stats[call["provider"].name].record_abandoned(now - call["start"])
+        self._save_stats()
+
+    @staticmethod
+    def _cache_mode(mode: str, require_current: bool, require_precip: bool) -> str:
+        return mode + ("+current" if require_current else "") + ("+precip" if require_precip else "")
+
+    def _hedge_delay(self, provider: WeatherProvider) -> float:
+        with self._lock:
+            latency = self.stats[provider.name].estimate()
+        if latency is None:
+            return 0.5
+        return min(2.0, max(0.2, latency * 1.5))
+
+    def fastest(self, timeout: float = REQUEST_TIMEOUT, hedge_after: Optional[float] = None,
+                require_current: bool = False, require_precip: bool = False) -> Optional[Forecast]:
+        """Hedged request: start the best provider, add the next one each time
+        the hedge delay passes without a healthy answer, return the first.
+        require_current / require_precip skip providers that can't report
+        observed current conditions / rain amounts."""
+        mode = self._cache_mode("fastest", require_current, require_precip)
+        cached = self._load_cache(mode)
+        if cached:
+            return cached
+        calls: Dict = {}
+        try:
+            forecast = self._fastest(timeout, hedge_after, require_current, require_precip, calls)
+        finally:
+            self._finish(calls)
+        return self._save_cache(mode, forecast)
+
+    def _fastest(self, timeout: float, hedge_after: Optional[float],
+                 require_current: bool, require_precip: bool, calls: Dict) -> Optional[Forecast]:
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        waiting = self.ranked(require_current, require_precip)
+        if not waiting:
+            return None
+
+        deadline = time.monotonic() + timeout
+        pending = set()
+        while waiting or pending:
+            if waiting:
+                provider = waiting.pop(0)
+                pending.add(self._submit(provider, calls))
+                delay = hedge_after if hedge_after is not None else self._hedge_delay(provider)
+            else:
+                delay = deadline - time.monotonic()
+
+            delay = min(delay, deadline - time.monotonic())
+            if delay <= 0:
+                break
+            done, pending = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                forecast = future.result()
+                if forecast and (forecast.current or not require_current) \
+                        and (forecast.has_precip_amounts or not require_precip):
+                    return forecast
+            if not waiting and not pending:
+                break
+        return None
+
+    def consensus(self, timeout: float = REQUEST_TIMEOUT, min_sources: int = 2,
+                  require_current: bool = False) -> Optional[Forecast]:
+        """Ask every provider at once and merge the healthy answers.
+        Falls back to a single forecast when fewer than min_sources respond.
+        Rain amounts a provider doesn't report are left out of the merge."""
+        mode = self._cache_mode("consensus", require_current, False)
+        cached = self._load_cache(mode)
+        if cached:
+            return cached
+        calls: Dict = {}
+        try:
+            forecast = self._consensus(timeout, min_sources, require_current, calls)
+        finally:
+            self._finish(calls)
+        return self._save_cache(mode, forecast)
+
+    def _consensus(self, timeout: float, min_sources: int, require_current: bool,
+                   calls: Dict) -> Optional[Forecast]:
+        from concurrent.futures import wait
+
+        futures = [self._submit(p, calls) for p in self.ranked(require_current)]
+        done, _ = wait(futures, timeout=timeout)
+        forecasts = [f.result() for f in done if f.result()]
+        if require_current:
+            forecasts = [f for f in forecasts if f.current]
+        if not forecasts:
+            return None
+        if len(forecasts) < min_sources:
+            return forecasts[0]
+        return consensus(forecasts)
+
+    def report(self, forecast: Optional[Forecast] = None) -> List[str]:
+        """One line per provider: EWMA latency and success/failure counts.
+        Pass the forecast a call returned to say so when it came from the cache."""
+        if forecast and forecast.from_cache:
+            age = (datetime.now() - forecast.fetched_at).total_seconds()
+            return [f"cache: {forecast.provider} forecast, {age:.0f}s old"]
+        lines = []
+        for p in self.ranked():
+            s = self.stats[p.name]
+            latency = f"{s.latency * 1000:.0f}ms" if s.latency is not None else "untried"
+            lines.append(f"{p.name}: {latency} ({s.successes} ok, {s.failures} failed)")
+        return lines
+
+
+def default_providers(openweather_key: str = "") -> List[WeatherProvider]:
+    """Every provider we know about; ones without credentials are skipped by WeatherService."""
+    return [
+        OpenWeatherOneCall(openweather_key),
+        OpenWeatherForecast(openweather_key),
+        OpenMeteo(),
+        NationalWeatherService(),
+    ]